@@ -0,0 +1,100 @@
+"""
+JIT-compiled kernels for the hot camera feed computations.
+
+Kernels operate on the struct-of-arrays columns built by DataLoader. Numba is
+optional: without it the same functions fall back to vectorized NumPy.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Bit flags telling search_indices which predicates are active
+SEARCH_THEATER = 1
+SEARCH_CODEC = 2
+SEARCH_MIN_WIDTH = 4
+SEARCH_MIN_HEIGHT = 8
+SEARCH_MAX_LATENCY = 16
+SEARCH_ENCRYPTED = 32
+SEARCH_CIVILIAN_SAFE = 64
+
+
+def _quality_scores_numpy(res_w, res_h, codec, lat, modern_codes):
+    """Vectorized NumPy version of the quality score kernel."""
+    high_res = (res_w >= 1920) & (res_h >= 1080)
+    modern_codec = np.isin(codec, np.asarray(modern_codes))
+    low_latency = lat <= 500
+    return (high_res * 3 + modern_codec * 2 + low_latency * 1).astype(np.int8)
+
+
+def _search_indices_numpy(theater_code, codec_code, res_w, res_h, lat, encr, civ,
+                          t_val, c_val, min_w, min_h, max_lat, want_encr, want_civ, use_mask):
+    """Vectorized NumPy version of the search kernel."""
+    mask = np.ones(res_w.shape[0], dtype=np.bool_)
+    if use_mask & SEARCH_THEATER:
+        mask &= theater_code == t_val
+    if use_mask & SEARCH_CODEC:
+        mask &= codec_code == c_val
+    if use_mask & SEARCH_MIN_WIDTH:
+        mask &= res_w >= min_w
+    if use_mask & SEARCH_MIN_HEIGHT:
+        mask &= res_h >= min_h
+    if use_mask & SEARCH_MAX_LATENCY:
+        mask &= lat <= max_lat
+    if use_mask & SEARCH_ENCRYPTED:
+        mask &= encr == want_encr
+    if use_mask & SEARCH_CIVILIAN_SAFE:
+        mask &= civ == want_civ
+    return np.flatnonzero(mask)
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def quality_scores(res_w, res_h, codec, lat, modern_codes):
+        """Score every feed in a single pass: 3 for >=1080p, 2 for a modern codec, 1 for <=500ms latency."""
+        n = res_w.shape[0]
+        scores = np.empty(n, dtype=np.int8)
+        for i in range(n):
+            score = 0
+            if res_w[i] >= 1920 and res_h[i] >= 1080:
+                score += 3
+            for code in modern_codes:
+                if codec[i] == code:
+                    score += 2
+                    break
+            if lat[i] <= 500:
+                score += 1
+            scores[i] = score
+        return scores
+
+    @njit(cache=True, fastmath=True)
+    def search_indices(theater_code, codec_code, res_w, res_h, lat, encr, civ,
+                       t_val, c_val, min_w, min_h, max_lat, want_encr, want_civ, use_mask):
+        """Row positions matching every predicate flagged in ``use_mask``, in one pass."""
+        n = res_w.shape[0]
+        out_idx = np.empty(n, dtype=np.intp)
+        count = 0
+        for i in range(n):
+            if use_mask & SEARCH_THEATER and theater_code[i] != t_val:
+                continue
+            if use_mask & SEARCH_CODEC and codec_code[i] != c_val:
+                continue
+            if use_mask & SEARCH_MIN_WIDTH and res_w[i] < min_w:
+                continue
+            if use_mask & SEARCH_MIN_HEIGHT and res_h[i] < min_h:
+                continue
+            if use_mask & SEARCH_MAX_LATENCY and lat[i] > max_lat:
+                continue
+            if use_mask & SEARCH_ENCRYPTED and encr[i] != want_encr:
+                continue
+            if use_mask & SEARCH_CIVILIAN_SAFE and civ[i] != want_civ:
+                continue
+            out_idx[count] = i
+            count += 1
+        return out_idx[:count]
+else:
+    quality_scores = _quality_scores_numpy
+    search_indices = _search_indices_numpy
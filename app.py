@@ -5,6 +5,7 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from src.query_agent import QueryAgent
+from src.mcp_tools import MCPTools
 import json
 import pandas as pd
 
@@ -51,6 +52,43 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+SAMPLE_QUERY_PLACEHOLDER = "— pick one —"
+SAMPLE_QUERIES = (
+    "What are the camera IDs capturing the Pacific area with the best clarity?",
+    "Show me all 4K cameras in the Pacific region",
+    "Which cameras have the lowest latency for real-time monitoring?",
+    "Find encrypted feeds with H265 codec and high frame rates",
+    "What's the best quality camera for surveillance in Europe?",
+    "Show me all civilian-safe cameras in the Middle East",
+    "Which cameras use the Viper-VL analytics model?",
+    "Find all cameras with latency under 200ms"
+)
+
+@st.cache_resource(show_spinner=False)
+def _get_tools(data_dir: str = ".") -> MCPTools:
+    """Load the camera feed data once per process and share it across sessions."""
+    return MCPTools(data_dir)
+
+@st.cache_resource(show_spinner=False)
+def _get_agent(api_key: str, data_dir: str = ".") -> QueryAgent:
+    """Build the query agent once per process on top of the shared MCP tools."""
+    return QueryAgent(api_key, data_dir, mcp_tools=_get_tools(data_dir))
+
+@st.cache_data(show_spinner=False)
+def _theater_stats():
+    """Cached theater distribution for the Quick Stats panel."""
+    return _get_tools(".").analyze_theater_distribution()
+
+@st.cache_data(show_spinner=False)
+def _codec_stats():
+    """Cached codec distribution for the Quick Stats panel."""
+    return _get_tools(".").analyze_codec_distribution()
+
+@st.cache_data(show_spinner=False)
+def _quality_stats():
+    """Cached high quality feed ranking for the Quick Stats panel."""
+    return _get_tools(".").get_high_quality_feeds()
+
 def initialize_agent():
     """Initialize the query agent."""
     api_key = os.getenv("OPENAI_API_KEY")
@@ -60,7 +98,7 @@ def initialize_agent():
     
     if "agent" not in st.session_state:
         with st.spinner("Initializing query system..."):
-            st.session_state.agent = QueryAgent(api_key)
+            st.session_state.agent = _get_agent(api_key)
     return st.session_state.agent
 
 def display_data_overview():
@@ -81,24 +119,89 @@ def display_data_overview():
     with col4:
         st.metric("Resolution Range", "480p - 4K")
 
+def _use_sample_query():
+    """Copy the selected sample query into the query input."""
+    choice = st.session_state.sample_query
+    if choice != SAMPLE_QUERY_PLACEHOLDER:
+        st.session_state.query_input = choice
+
 def display_sample_queries():
     """Display sample queries for users."""
     st.subheader("💡 Sample Queries")
     
-    sample_queries = [
-        "What are the camera IDs capturing the Pacific area with the best clarity?",
-        "Show me all 4K cameras in the Pacific region",
-        "Which cameras have the lowest latency for real-time monitoring?",
-        "Find encrypted feeds with H265 codec and high frame rates",
-        "What's the best quality camera for surveillance in Europe?",
-        "Show me all civilian-safe cameras in the Middle East",
-        "Which cameras use the Viper-VL analytics model?",
-        "Find all cameras with latency under 200ms"
-    ]
-    
-    for i, query in enumerate(sample_queries, 1):
-        if st.button(f"{i}. {query}", key=f"sample_{i}", use_container_width=True):
-            st.session_state.query_input = query
+    st.selectbox(
+        "Try a sample query:",
+        (SAMPLE_QUERY_PLACEHOLDER, *SAMPLE_QUERIES),
+        key="sample_query",
+        on_change=_use_sample_query
+    )
+
+def stream_query(agent, query):
+    """Render the agent's response as it streams in and return the full result."""
+    result = {}
+
+    def chunks():
+        result.update((yield from agent.query_stream(query)))
+
+    st.write_stream(chunks())
+    return result
+
+def display_detailed_analysis(result):
+    """Display the intent analysis and per-tool data results of a query."""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Intent Analysis")
+        if result.get("intent"):
+            st.json(result["intent"])
+        else:
+            st.info("No intent analysis available")
+    
+    with col2:
+        st.subheader("Data Results")
+        if result.get("data_results"):
+            # Try to display as table if it's feed data
+            data_results = result["data_results"]
+            for tool_name, data in data_results.items():
+                if isinstance(data, dict) and "call_args" in data:
+                    # One of several calls to the same tool: name it by its arguments
+                    tool_name = tool_name.partition("#")[0]
+                    args = ", ".join(f"{key}={value}" for key, value in data["call_args"].items())
+                    tool_name = f"{tool_name}({args})"
+                if isinstance(data, dict) and "feeds" in data:
+                    st.subheader(f"Results from {tool_name}")
+                    df = pd.DataFrame(data["feeds"])
+                    if not df.empty:
+                        st.dataframe(df, use_container_width=True)
+                    else:
+                        st.info("No feeds found matching the criteria")
+                else:
+                    st.subheader(f"Results from {tool_name}")
+                    st.json(data)
+        else:
+            st.info("No data results available")
+
+@st.fragment
+def display_quick_stats():
+    """Display quick statistics; widget interactions inside this panel rerun only the panel."""
+    st.subheader("📈 Quick Stats")
+    
+    # Get some quick statistics
+    try:
+        # Theater distribution
+        theater_stats = _theater_stats()
+        st.metric("Theater Distribution", f"{len(theater_stats['theater_distribution'])} regions")
+        
+        # Codec distribution
+        codec_stats = _codec_stats()
+        st.metric("Codec Types", f"{len(codec_stats['codec_distribution'])} formats")
+        
+        # High quality feeds
+        quality_feeds = _quality_stats()
+        st.metric("High Quality Feeds", f"{quality_feeds['count']} feeds")
+        
+    except Exception as e:
+        st.error(f"Error loading stats: {str(e)}")
 
 def main():
     """Main application function."""
@@ -148,14 +251,14 @@ def main():
         )
         
         # Query buttons
+        pending_query = None
         col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 2])
         
         with col_btn1:
             if st.button("🚀 Query", type="primary", use_container_width=True):
                 if query_input.strip():
-                    with st.spinner("Processing query..."):
-                        result = agent.query(query_input)
-                        st.session_state.last_result = result
+                    # Answered below, where the response is streamed into the results box
+                    pending_query = query_input
                 else:
                     st.warning("Please enter a query")
         
@@ -166,68 +269,27 @@ def main():
                 st.rerun()
     
     with col2:
-        st.subheader("📈 Quick Stats")
-        
-        # Get some quick statistics
-        try:
-            mcp_tools = agent.mcp_tools
-            
-            # Theater distribution
-            theater_stats = mcp_tools.analyze_theater_distribution()
-            st.metric("Theater Distribution", f"{len(theater_stats['theater_distribution'])} regions")
-            
-            # Codec distribution
-            codec_stats = mcp_tools.analyze_codec_distribution()
-            st.metric("Codec Types", f"{len(codec_stats['codec_distribution'])} formats")
-            
-            # High quality feeds
-            quality_feeds = mcp_tools.get_high_quality_feeds()
-            st.metric("High Quality Feeds", f"{quality_feeds['count']} feeds")
-            
-        except Exception as e:
-            st.error(f"Error loading stats: {str(e)}")
+        display_quick_stats()
     
     # Display results
-    if "last_result" in st.session_state and st.session_state.last_result:
-        result = st.session_state.last_result
-        
+    if pending_query or st.session_state.get("last_result"):
         st.divider()
         st.subheader("📋 Query Results")
         
         # Response
         st.markdown('<div class="response-box">', unsafe_allow_html=True)
-        st.write(result["response"])
+        if pending_query:
+            with st.spinner("Processing query..."):
+                st.session_state.last_result = stream_query(agent, pending_query)
+        else:
+            st.write(st.session_state.last_result["response"])
         st.markdown('</div>', unsafe_allow_html=True)
+        result = st.session_state.last_result
         
-        # Detailed results (expandable)
-        with st.expander("🔍 Detailed Analysis", expanded=False):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("Intent Analysis")
-                if result.get("intent"):
-                    st.json(result["intent"])
-                else:
-                    st.info("No intent analysis available")
-            
-            with col2:
-                st.subheader("Data Results")
-                if result.get("data_results"):
-                    # Try to display as table if it's feed data
-                    data_results = result["data_results"]
-                    for tool_name, data in data_results.items():
-                        if isinstance(data, dict) and "feeds" in data:
-                            st.subheader(f"Results from {tool_name}")
-                            if data["feeds"]:
-                                df = pd.DataFrame(data["feeds"])
-                                st.dataframe(df, use_container_width=True)
-                            else:
-                                st.info("No feeds found matching the criteria")
-                        else:
-                            st.subheader(f"Results from {tool_name}")
-                            st.json(data)
-                else:
-                    st.info("No data results available")
+        # Detailed results (expandable); built only once the user asks for them
+        with st.expander("🔍 Detailed Analysis", expanded=st.session_state.get("details_open", False)):
+            if st.toggle("Show detailed analysis", key="details_open"):
+                display_detailed_analysis(result)
         
         # Error handling
         if result.get("error"):
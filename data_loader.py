@@ -2,19 +2,44 @@
 Data loading and preprocessing module for camera feeds, encoder, and decoder data.
 """
 import pandas as pd
-import json
-from typing import Dict, List, Any, Optional
+import numpy as np
+import orjson
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
+from ._jit_kernels import quality_scores
+
+_EMPTY_IDX = np.empty(0, dtype=np.intp)
 
 
 class DataLoader:
     """Handles loading and preprocessing of all data files."""
     
+    # Low-cardinality columns that are dictionary-encoded into int8 codes
+    CATEGORICAL_COLUMNS = ('THEATER', 'CODEC', 'MODL_TAG')
+    BOOL_COLUMNS = ('ENCR', 'CIV_OK')
+    FEED_DTYPES = {
+        'THEATER': 'category',
+        'CODEC': 'category',
+        'MODL_TAG': 'category',
+        'ENCR': 'bool',
+        'CIV_OK': 'bool'
+    }
+    MODERN_CODECS = ('H265', 'AV1', 'VP9')
+    
     def __init__(self, data_dir: str = "."):
         self.data_dir = Path(data_dir)
         self.camera_feeds = None
+        self.cols = None
+        self.cat = None
+        self.theater_idx = None
+        self.codec_idx = None
+        self.model_idx = None
+        self.feed_id_idx = None
+        self.feed_id_sample = None
         self.encoder_params = None
         self.decoder_params = None
+        self.encoder_params_json = None
+        self.decoder_params_json = None
         self.encoder_schema = None
         self.decoder_schema = None
         self.table_defs = None
@@ -24,34 +49,108 @@ class DataLoader:
         data = {}
         
         # Load camera feeds
-        self.camera_feeds = pd.read_csv(self.data_dir / "Table_feeds_v2.csv")
+        self.camera_feeds = self._load_table(self.data_dir / "Table_feeds_v2.csv", dtype=self.FEED_DTYPES)
         data['camera_feeds'] = self.camera_feeds
+        self._build_columns()
+        self._build_indexes()
         
         # Load encoder parameters
-        with open(self.data_dir / "encoder_params.json", 'r') as f:
-            self.encoder_params = json.load(f)
+        self.encoder_params = self._read_json(self.data_dir / "encoder_params.json")
+        self.encoder_params_json = orjson.dumps(self.encoder_params)
         data['encoder_params'] = self.encoder_params
         
         # Load decoder parameters
-        with open(self.data_dir / "decoder_params.json", 'r') as f:
-            self.decoder_params = json.load(f)
+        self.decoder_params = self._read_json(self.data_dir / "decoder_params.json")
+        self.decoder_params_json = orjson.dumps(self.decoder_params)
         data['decoder_params'] = self.decoder_params
         
         # Load schemas
-        with open(self.data_dir / "encoder_schema.json", 'r') as f:
-            self.encoder_schema = json.load(f)
+        self.encoder_schema = self._read_json(self.data_dir / "encoder_schema.json")
         data['encoder_schema'] = self.encoder_schema
         
-        with open(self.data_dir / "decoder_schema.json", 'r') as f:
-            self.decoder_schema = json.load(f)
+        self.decoder_schema = self._read_json(self.data_dir / "decoder_schema.json")
         data['decoder_schema'] = self.decoder_schema
         
         # Load table definitions
-        self.table_defs = pd.read_csv(self.data_dir / "Table_defs_v2.csv")
+        self.table_defs = self._load_table(self.data_dir / "Table_defs_v2.csv")
         data['table_defs'] = self.table_defs
         
         return data
     
+    @classmethod
+    def _load_table(cls, path: Path, dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Load a CSV table through a Feather cache stored next to it.
+        
+        The cache is used when it is newer than the CSV; otherwise the CSV is
+        parsed and the cache rewritten. Cache problems (no pyarrow, read-only
+        directory, corrupt file) fall back to parsing the CSV.
+        """
+        cache = path.with_suffix('.feather')
+        try:
+            if cache.stat().st_mtime >= path.stat().st_mtime:
+                return pd.read_feather(cache)
+        except (ImportError, OSError, ValueError):
+            pass
+        
+        table = cls._read_csv(path, dtype=dtype)
+        try:
+            table.to_feather(cache)
+        except (ImportError, OSError, ValueError):
+            pass
+        return table
+    
+    @staticmethod
+    def _read_csv(path: Path, dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Parse a CSV with the multithreaded pyarrow engine, falling back to the C engine."""
+        try:
+            return pd.read_csv(path, engine='pyarrow', dtype=dtype)
+        except ImportError:
+            return pd.read_csv(path, dtype=dtype)
+    
+    @staticmethod
+    def _read_json(path: Path) -> Any:
+        """Parse a JSON file with orjson."""
+        return orjson.loads(path.read_bytes())
+    
+    def _build_columns(self):
+        """Materialize the feeds as one NumPy array per column (struct of arrays).
+        
+        Categorical columns are stored as ``(codes, categories)`` pairs taken from
+        the pandas Categorical (categories are sorted at ingest), so equality
+        filters become integer comparisons on the codes.
+        """
+        feeds = self.camera_feeds
+        self.cols = {
+            c: feeds[c].to_numpy() for c in feeds.columns
+            if c not in self.CATEGORICAL_COLUMNS
+        }
+        for c in self.BOOL_COLUMNS:
+            self.cols[c] = feeds[c].to_numpy(dtype=np.bool_)
+        self.cat = {}
+        for c in self.CATEGORICAL_COLUMNS:
+            column = feeds[c].cat.as_unordered()
+            if not column.cat.categories.is_monotonic_increasing:
+                column = column.cat.reorder_categories(column.cat.categories.sort_values())
+            self.cat[c] = (column.cat.codes.to_numpy(), column.cat.categories.to_numpy())
+    
+    def _build_indexes(self):
+        """Precompute hash lookups from category value (or feed ID) to row positions."""
+        feeds = self.camera_feeds
+        self.theater_idx = feeds.groupby('THEATER', observed=True).indices
+        self.codec_idx = feeds.groupby('CODEC', observed=True).indices
+        self.model_idx = feeds.groupby('MODL_TAG', observed=True).indices
+        self.feed_id_idx = dict(zip(feeds['FEED_ID'], range(len(feeds))))
+        # Example IDs shown when a lookup misses
+        self.feed_id_sample = feeds['FEED_ID'].head(10).tolist()
+    
+    def category_code(self, column: str, value: str) -> int:
+        """Return the integer code for a categorical value, or -1 if absent."""
+        uniques = self.cat[column][1]
+        pos = int(np.searchsorted(uniques, value))
+        if pos < len(uniques) and uniques[pos] == value:
+            return pos
+        return -1
+    
     def get_camera_feeds(self) -> pd.DataFrame:
         """Get camera feeds dataframe."""
         if self.camera_feeds is None:
@@ -70,73 +169,135 @@ class DataLoader:
             self.load_all_data()
         return self.decoder_params
     
+    def get_encoder_params_bytes(self) -> bytes:
+        """Get encoder parameters pre-serialized as compact JSON bytes."""
+        if self.encoder_params_json is None:
+            self.load_all_data()
+        return self.encoder_params_json
+    
+    def get_decoder_params_bytes(self) -> bytes:
+        """Get decoder parameters pre-serialized as compact JSON bytes."""
+        if self.decoder_params_json is None:
+            self.load_all_data()
+        return self.decoder_params_json
+    
+    # Index-returning filters: each returns the matching row positions so callers
+    # can gather only the rows/columns they need. The DataFrame variants below
+    # are thin wrappers around them.
+    
+    def get_feeds_by_theater_idx(self, theater: str) -> np.ndarray:
+        """Row positions of camera feeds in a theater."""
+        self.get_camera_feeds()
+        return self.theater_idx.get(theater.upper(), _EMPTY_IDX)
+    
+    def get_feeds_by_codec_idx(self, codec: str) -> np.ndarray:
+        """Row positions of camera feeds using a codec."""
+        self.get_camera_feeds()
+        return self.codec_idx.get(codec.upper(), _EMPTY_IDX)
+    
+    def get_feeds_by_resolution_idx(self, min_width: int = None, min_height: int = None,
+                                    max_width: int = None, max_height: int = None) -> np.ndarray:
+        """Row positions of camera feeds within a resolution range."""
+        feeds = self.get_camera_feeds()
+        res_w, res_h = self.cols['RES_W'], self.cols['RES_H']
+        mask = np.ones(len(feeds), dtype=bool)
+        
+        if min_width is not None:
+            mask &= res_w >= min_width
+        if min_height is not None:
+            mask &= res_h >= min_height
+        if max_width is not None:
+            mask &= res_w <= max_width
+        if max_height is not None:
+            mask &= res_h <= max_height
+            
+        return np.flatnonzero(mask)
+    
+    def get_feeds_by_latency_idx(self, max_latency: int = None, min_latency: int = None) -> np.ndarray:
+        """Row positions of camera feeds within a latency range."""
+        feeds = self.get_camera_feeds()
+        lat = self.cols['LAT_MS']
+        mask = np.ones(len(feeds), dtype=bool)
+        
+        if max_latency is not None:
+            mask &= lat <= max_latency
+        if min_latency is not None:
+            mask &= lat >= min_latency
+            
+        return np.flatnonzero(mask)
+    
+    def get_high_quality_feeds_idx(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row positions of all feeds ordered by quality score, and the matching scores."""
+        self.get_camera_feeds()
+        cols = self.cols
+        
+        # Single fused pass over the columns: 3 for high res, 2 for a modern codec, 1 for low latency
+        # Modern codecs absent from the data (code -1) are dropped: -1 marks missing CODEC values
+        modern_codes = np.array(
+            [code for code in (self.category_code('CODEC', c) for c in self.MODERN_CODECS) if code >= 0],
+            dtype=np.int64
+        )
+        scores = quality_scores(
+            cols['RES_W'], cols['RES_H'], self.cat['CODEC'][0], cols['LAT_MS'], modern_codes
+        )
+        order = np.argsort(-scores, kind='stable')
+        
+        return order, scores[order]
+    
+    def get_feeds_by_model_idx(self, model_tag: str) -> np.ndarray:
+        """Row positions of camera feeds using an analytics model."""
+        self.get_camera_feeds()
+        return self.model_idx.get(model_tag, _EMPTY_IDX)
+    
+    def get_encrypted_feeds_idx(self, encrypted: bool = True) -> np.ndarray:
+        """Row positions of camera feeds with the given encryption status."""
+        self.get_camera_feeds()
+        encr = self.cols['ENCR']
+        return np.flatnonzero(encr if encrypted else ~encr)
+    
+    def get_civilian_safe_feeds_idx(self, safe: bool = True) -> np.ndarray:
+        """Row positions of camera feeds with the given civilian safety status."""
+        self.get_camera_feeds()
+        civ_ok = self.cols['CIV_OK']
+        return np.flatnonzero(civ_ok if safe else ~civ_ok)
+    
     def get_feeds_by_theater(self, theater: str) -> pd.DataFrame:
         """Filter camera feeds by theater."""
-        feeds = self.get_camera_feeds()
-        return feeds[feeds['THEATER'] == theater.upper()]
+        return self.get_camera_feeds().iloc[self.get_feeds_by_theater_idx(theater)]
     
     def get_feeds_by_codec(self, codec: str) -> pd.DataFrame:
         """Filter camera feeds by codec."""
-        feeds = self.get_camera_feeds()
-        return feeds[feeds['CODEC'] == codec.upper()]
+        return self.get_camera_feeds().iloc[self.get_feeds_by_codec_idx(codec)]
     
     def get_feeds_by_resolution(self, min_width: int = None, min_height: int = None, 
                                max_width: int = None, max_height: int = None) -> pd.DataFrame:
         """Filter camera feeds by resolution range."""
-        feeds = self.get_camera_feeds()
-        
-        if min_width:
-            feeds = feeds[feeds['RES_W'] >= min_width]
-        if min_height:
-            feeds = feeds[feeds['RES_H'] >= min_height]
-        if max_width:
-            feeds = feeds[feeds['RES_W'] <= max_width]
-        if max_height:
-            feeds = feeds[feeds['RES_H'] <= max_height]
-            
-        return feeds
+        idx = self.get_feeds_by_resolution_idx(min_width, min_height, max_width, max_height)
+        return self.get_camera_feeds().iloc[idx]
     
     def get_feeds_by_latency(self, max_latency: int = None, min_latency: int = None) -> pd.DataFrame:
         """Filter camera feeds by latency range."""
-        feeds = self.get_camera_feeds()
-        
-        if max_latency:
-            feeds = feeds[feeds['LAT_MS'] <= max_latency]
-        if min_latency:
-            feeds = feeds[feeds['LAT_MS'] >= min_latency]
-            
-        return feeds
+        return self.get_camera_feeds().iloc[self.get_feeds_by_latency_idx(max_latency, min_latency)]
     
     def get_high_quality_feeds(self) -> pd.DataFrame:
         """Get feeds with high quality metrics (4K resolution, modern codec, low latency)."""
-        feeds = self.get_camera_feeds()
-        
-        # Define quality criteria
-        high_res = (feeds['RES_W'] >= 1920) & (feeds['RES_H'] >= 1080)
-        modern_codec = feeds['CODEC'].isin(['H265', 'AV1', 'VP9'])
-        low_latency = feeds['LAT_MS'] <= 500
-        
-        # Calculate quality score
-        feeds = feeds.copy()
-        feeds['quality_score'] = (
-            (high_res.astype(int) * 3) + 
-            (modern_codec.astype(int) * 2) + 
-            (low_latency.astype(int) * 1)
-        )
-        
-        return feeds.sort_values('quality_score', ascending=False)
+        order, scores = self.get_high_quality_feeds_idx()
+        return self.get_camera_feeds().iloc[order].assign(quality_score=scores)
     
     def get_feeds_by_model(self, model_tag: str) -> pd.DataFrame:
         """Filter camera feeds by analytics model."""
+        return self.get_camera_feeds().iloc[self.get_feeds_by_model_idx(model_tag)]
+    
+    def get_feed_by_id(self, feed_id: str) -> Optional[pd.Series]:
+        """Look up a single camera feed by ID, or None if it does not exist."""
         feeds = self.get_camera_feeds()
-        return feeds[feeds['MODL_TAG'] == model_tag]
+        row = self.feed_id_idx.get(feed_id)
+        return None if row is None else feeds.iloc[row]
     
     def get_encrypted_feeds(self, encrypted: bool = True) -> pd.DataFrame:
         """Filter camera feeds by encryption status."""
-        feeds = self.get_camera_feeds()
-        return feeds[feeds['ENCR'] == encrypted]
+        return self.get_camera_feeds().iloc[self.get_encrypted_feeds_idx(encrypted)]
     
     def get_civilian_safe_feeds(self, safe: bool = True) -> pd.DataFrame:
         """Filter camera feeds by civilian safety compliance."""
-        feeds = self.get_camera_feeds()
-        return feeds[feeds['CIV_OK'] == safe]
+        return self.get_camera_feeds().iloc[self.get_civilian_safe_feeds_idx(safe)]
\ No newline at end of file
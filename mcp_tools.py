@@ -4,7 +4,36 @@ These tools provide structured access to camera feed data for the agentic system
 """
 from typing import Dict, List, Any, Optional, Union
 import pandas as pd
+import numpy as np
 from .data_loader import DataLoader
+from ._jit_kernels import (
+    search_indices, SEARCH_THEATER, SEARCH_CODEC, SEARCH_MIN_WIDTH, SEARCH_MIN_HEIGHT,
+    SEARCH_MAX_LATENCY, SEARCH_ENCRYPTED, SEARCH_CIVILIAN_SAFE
+)
+
+
+# Common resolution categories reported by analyze_resolution_distribution
+_RES_MAP = {
+    '4K (3840x2160)': (3840, 2160),
+    '1440p (2560x1440)': (2560, 1440),
+    '1080p (1920x1080)': (1920, 1080),
+    '720p (1280x720)': (1280, 720),
+    '480p (640x480)': (640, 480)
+}
+
+
+def _pack(feeds: pd.DataFrame, columns: Optional[List[str]] = None,
+          idx: Optional[np.ndarray] = None) -> Dict[str, List[Any]]:
+    """Pack feeds column-wise as ``{column: [values...]}``.
+    
+    Only the requested ``columns`` are touched, and when ``idx`` row positions
+    are given each of those columns is gathered directly, without slicing the
+    whole DataFrame first.
+    """
+    cols = columns or feeds.columns
+    if idx is None:
+        return {c: feeds[c].tolist() for c in cols}
+    return {c: feeds[c].take(idx).tolist() for c in cols}
 
 
 class MCPTools:
@@ -13,58 +42,100 @@ class MCPTools:
     def __init__(self, data_dir: str = "."):
         self.data_loader = DataLoader(data_dir)
         self.data_loader.load_all_data()
+        
+        # The feed schema is fixed after load; share one read-only tuple across results
+        self._columns = tuple(self.data_loader.get_camera_feeds().columns)
+        self._quality_columns = self._columns + ('quality_score',)
+        
+        # The data never changes after load, so argument-free results are built once.
+        # They are returned by reference: callers must treat them as read-only.
+        self._all_feeds_payload = self._compute_all_camera_feeds()
+        self._encoder_payload = {
+            "encoder_params": self.data_loader.get_encoder_params(),
+            "description": "Video encoding configuration for all camera feeds"
+        }
+        self._decoder_payload = {
+            "decoder_params": self.data_loader.get_decoder_params(),
+            "description": "Video decoding configuration for all camera feeds"
+        }
+        self._encoder_payload_raw = {
+            **self._encoder_payload,
+            "encoder_params_json": self.data_loader.get_encoder_params_bytes()
+        }
+        self._decoder_payload_raw = {
+            **self._decoder_payload,
+            "decoder_params_json": self.data_loader.get_decoder_params_bytes()
+        }
+        self._theater_stats = self._compute_theater_distribution()
+        self._codec_stats = self._compute_codec_distribution()
+        self._resolution_stats = self._compute_resolution_distribution()
     
-    def get_all_camera_feeds(self) -> Dict[str, Any]:
+    def get_all_camera_feeds(self, columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Get all camera feeds data.
         
+        Args:
+            columns: Optional subset of columns to return (default: all)
+            
         Returns:
             Dict containing all camera feeds with metadata
         """
+        if columns is None:
+            return self._all_feeds_payload
+        return self._compute_all_camera_feeds(columns)
+    
+    def _compute_all_camera_feeds(self, columns: Optional[List[str]] = None) -> Dict[str, Any]:
         feeds = self.data_loader.get_camera_feeds()
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns),
             "total_count": len(feeds),
-            "columns": list(feeds.columns)
+            "columns": columns or self._columns
         }
     
-    def filter_by_theater(self, theater: str) -> Dict[str, Any]:
+    def filter_by_theater(self, theater: str,
+                          columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Filter camera feeds by geographic theater.
         
         Args:
             theater: Theater code (CONUS, PAC, EUR, ME, AFR, ARC)
+            columns: Optional subset of columns to return (default: all)
             
         Returns:
             Dict containing filtered feeds and metadata
         """
-        feeds = self.data_loader.get_feeds_by_theater(theater)
+        feeds = self.data_loader.get_camera_feeds()
+        idx = self.data_loader.get_feeds_by_theater_idx(theater)
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "theater": theater,
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
     
-    def filter_by_codec(self, codec: str) -> Dict[str, Any]:
+    def filter_by_codec(self, codec: str,
+                        columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Filter camera feeds by video codec.
         
         Args:
             codec: Codec type (H264, H265, AV1, VP9, MPEG2)
+            columns: Optional subset of columns to return (default: all)
             
         Returns:
             Dict containing filtered feeds and metadata
         """
-        feeds = self.data_loader.get_feeds_by_codec(codec)
+        feeds = self.data_loader.get_camera_feeds()
+        idx = self.data_loader.get_feeds_by_codec_idx(codec)
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "codec": codec,
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
     
     def filter_by_resolution(self, min_width: Optional[int] = None, 
                            min_height: Optional[int] = None,
                            max_width: Optional[int] = None,
-                           max_height: Optional[int] = None) -> Dict[str, Any]:
+                           max_height: Optional[int] = None,
+                           columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Filter camera feeds by resolution range.
         
         Args:
@@ -72,45 +143,50 @@ class MCPTools:
             min_height: Minimum height in pixels
             max_width: Maximum width in pixels
             max_height: Maximum height in pixels
+            columns: Optional subset of columns to return (default: all)
             
         Returns:
             Dict containing filtered feeds and metadata
         """
-        feeds = self.data_loader.get_feeds_by_resolution(
+        feeds = self.data_loader.get_camera_feeds()
+        idx = self.data_loader.get_feeds_by_resolution_idx(
             min_width, min_height, max_width, max_height
         )
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "resolution_filter": {
                 "min_width": min_width,
                 "min_height": min_height,
                 "max_width": max_width,
                 "max_height": max_height
             },
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
     
     def filter_by_latency(self, max_latency: Optional[int] = None,
-                         min_latency: Optional[int] = None) -> Dict[str, Any]:
+                         min_latency: Optional[int] = None,
+                         columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Filter camera feeds by latency range.
         
         Args:
             max_latency: Maximum latency in milliseconds
             min_latency: Minimum latency in milliseconds
+            columns: Optional subset of columns to return (default: all)
             
         Returns:
             Dict containing filtered feeds and metadata
         """
-        feeds = self.data_loader.get_feeds_by_latency(max_latency, min_latency)
+        feeds = self.data_loader.get_camera_feeds()
+        idx = self.data_loader.get_feeds_by_latency_idx(max_latency, min_latency)
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "latency_filter": {
                 "max_latency": max_latency,
                 "min_latency": min_latency
             },
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
     
     def get_high_quality_feeds(self) -> Dict[str, Any]:
@@ -124,90 +200,104 @@ class MCPTools:
         Returns:
             Dict containing high quality feeds sorted by quality score
         """
-        feeds = self.data_loader.get_high_quality_feeds()
+        feeds = self.data_loader.get_camera_feeds()
+        order, scores = self.data_loader.get_high_quality_feeds_idx()
+        payload = _pack(feeds, idx=order)
+        payload['quality_score'] = scores.tolist()
         return {
-            "feeds": feeds.to_dict('records'),
-            "count": len(feeds),
+            "feeds": payload,
+            "count": len(order),
             "quality_metrics": {
                 "resolution_weight": 3,
                 "codec_weight": 2,
                 "latency_weight": 1
             },
-            "columns": list(feeds.columns)
+            "columns": self._quality_columns
         }
     
-    def filter_by_model(self, model_tag: str) -> Dict[str, Any]:
+    def filter_by_model(self, model_tag: str,
+                        columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Filter camera feeds by analytics model.
         
         Args:
             model_tag: Model tag (e.g., Viper-VL, Hydra-ISR, Raptor-Det)
+            columns: Optional subset of columns to return (default: all)
             
         Returns:
             Dict containing filtered feeds and metadata
         """
-        feeds = self.data_loader.get_feeds_by_model(model_tag)
+        feeds = self.data_loader.get_camera_feeds()
+        idx = self.data_loader.get_feeds_by_model_idx(model_tag)
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "model_tag": model_tag,
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
     
-    def filter_by_encryption(self, encrypted: bool = True) -> Dict[str, Any]:
+    def filter_by_encryption(self, encrypted: bool = True,
+                             columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Filter camera feeds by encryption status.
         
         Args:
             encrypted: True for encrypted feeds, False for unencrypted
+            columns: Optional subset of columns to return (default: all)
             
         Returns:
             Dict containing filtered feeds and metadata
         """
-        feeds = self.data_loader.get_encrypted_feeds(encrypted)
+        feeds = self.data_loader.get_camera_feeds()
+        idx = self.data_loader.get_encrypted_feeds_idx(encrypted)
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "encrypted": encrypted,
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
     
-    def filter_by_civilian_safety(self, safe: bool = True) -> Dict[str, Any]:
+    def filter_by_civilian_safety(self, safe: bool = True,
+                                  columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """Filter camera feeds by civilian safety compliance.
         
         Args:
             safe: True for civilian-safe feeds, False for others
+            columns: Optional subset of columns to return (default: all)
             
         Returns:
             Dict containing filtered feeds and metadata
         """
-        feeds = self.data_loader.get_civilian_safe_feeds(safe)
+        feeds = self.data_loader.get_camera_feeds()
+        idx = self.data_loader.get_civilian_safe_feeds_idx(safe)
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "civilian_safe": safe,
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
     
-    def get_encoder_parameters(self) -> Dict[str, Any]:
+    def get_encoder_parameters(self, raw: bool = False) -> Dict[str, Any]:
         """Get video encoder parameters.
         
+        Args:
+            raw: Also include the configuration pre-serialized as JSON bytes
+                 under "encoder_params_json", for callers that need wire format
+            
         Returns:
             Dict containing encoder configuration
         """
-        return {
-            "encoder_params": self.data_loader.get_encoder_params(),
-            "description": "Video encoding configuration for all camera feeds"
-        }
+        return self._encoder_payload_raw if raw else self._encoder_payload
     
-    def get_decoder_parameters(self) -> Dict[str, Any]:
+    def get_decoder_parameters(self, raw: bool = False) -> Dict[str, Any]:
         """Get video decoder parameters.
         
+        Args:
+            raw: Also include the configuration pre-serialized as JSON bytes
+                 under "decoder_params_json", for callers that need wire format
+            
         Returns:
             Dict containing decoder configuration
         """
-        return {
-            "decoder_params": self.data_loader.get_decoder_params(),
-            "description": "Video decoding configuration for all camera feeds"
-        }
+        return self._decoder_payload_raw if raw else self._decoder_payload
     
     def analyze_theater_distribution(self) -> Dict[str, Any]:
         """Analyze distribution of camera feeds across theaters.
@@ -215,6 +305,9 @@ class MCPTools:
         Returns:
             Dict containing theater statistics
         """
+        return self._theater_stats
+    
+    def _compute_theater_distribution(self) -> Dict[str, Any]:
         feeds = self.data_loader.get_camera_feeds()
         theater_counts = feeds['THEATER'].value_counts().to_dict()
         
@@ -230,6 +323,9 @@ class MCPTools:
         Returns:
             Dict containing codec statistics
         """
+        return self._codec_stats
+    
+    def _compute_codec_distribution(self) -> Dict[str, Any]:
         feeds = self.data_loader.get_camera_feeds()
         codec_counts = feeds['CODEC'].value_counts().to_dict()
         
@@ -245,25 +341,22 @@ class MCPTools:
         Returns:
             Dict containing resolution statistics
         """
+        return self._resolution_stats
+    
+    def _compute_resolution_distribution(self) -> Dict[str, Any]:
         feeds = self.data_loader.get_camera_feeds()
         
-        # Group by common resolution categories
-        resolution_categories = {
-            '4K (3840x2160)': (feeds['RES_W'] == 3840) & (feeds['RES_H'] == 2160),
-            '1440p (2560x1440)': (feeds['RES_W'] == 2560) & (feeds['RES_H'] == 1440),
-            '1080p (1920x1080)': (feeds['RES_W'] == 1920) & (feeds['RES_H'] == 1080),
-            '720p (1280x720)': (feeds['RES_W'] == 1280) & (feeds['RES_H'] == 720),
-            '480p (640x480)': (feeds['RES_W'] == 640) & (feeds['RES_H'] == 480)
+        # One pass over the (width, height) pairs; the category labels are pure dict work
+        sizes = feeds.groupby(['RES_W', 'RES_H']).size()
+        resolution_counts = {
+            category: int(sizes.get(resolution, 0))
+            for category, resolution in _RES_MAP.items()
         }
         
-        resolution_counts = {}
-        for category, condition in resolution_categories.items():
-            resolution_counts[category] = condition.sum()
-        
         return {
             "resolution_distribution": resolution_counts,
             "total_feeds": len(feeds),
-            "unique_resolutions": len(feeds[['RES_W', 'RES_H']].drop_duplicates())
+            "unique_resolutions": len(sizes)
         }
     
     def get_feed_by_id(self, feed_id: str) -> Dict[str, Any]:
@@ -275,64 +368,89 @@ class MCPTools:
         Returns:
             Dict containing feed data or error message
         """
-        feeds = self.data_loader.get_camera_feeds()
-        feed = feeds[feeds['FEED_ID'] == feed_id]
+        feed = self.data_loader.get_feed_by_id(feed_id)
         
-        if len(feed) == 0:
+        if feed is None:
             return {
                 "error": f"Feed ID '{feed_id}' not found",
-                "available_feeds": feeds['FEED_ID'].tolist()[:10]  # Show first 10 as examples
+                "available_feeds": self.data_loader.feed_id_sample  # First 10 as examples
             }
         
         return {
-            "feed": feed.iloc[0].to_dict(),
+            "feed": feed.to_dict(),
             "found": True
         }
     
-    def search_feeds(self, **filters) -> Dict[str, Any]:
+    def search_feeds(self, columns: Optional[List[str]] = None, **filters) -> Dict[str, Any]:
         """Advanced search with multiple filters.
         
         Args:
+            columns: Optional subset of columns to return (default: all)
             **filters: Any combination of filters (theater, codec, min_width, etc.)
             
         Returns:
             Dict containing filtered feeds and applied filters
         """
-        feeds = self.data_loader.get_camera_feeds()
+        loader = self.data_loader
+        feeds = loader.get_camera_feeds()
+        cols, cat = loader.cols, loader.cat
         applied_filters = {}
         
-        # Apply each filter
+        # Translate the filters into kernel constants plus a bitfield of active predicates
+        use_mask = 0
+        t_val = c_val = min_w = min_h = max_lat = 0
+        want_encr = want_civ = False
+        
         if 'theater' in filters:
-            feeds = feeds[feeds['THEATER'] == filters['theater'].upper()]
+            use_mask |= SEARCH_THEATER
+            t_val = loader.category_code('THEATER', filters['theater'].upper())
             applied_filters['theater'] = filters['theater']
         
         if 'codec' in filters:
-            feeds = feeds[feeds['CODEC'] == filters['codec'].upper()]
+            use_mask |= SEARCH_CODEC
+            c_val = loader.category_code('CODEC', filters['codec'].upper())
             applied_filters['codec'] = filters['codec']
         
         if 'min_width' in filters:
-            feeds = feeds[feeds['RES_W'] >= filters['min_width']]
+            use_mask |= SEARCH_MIN_WIDTH
+            min_w = filters['min_width']
             applied_filters['min_width'] = filters['min_width']
         
         if 'min_height' in filters:
-            feeds = feeds[feeds['RES_H'] >= filters['min_height']]
+            use_mask |= SEARCH_MIN_HEIGHT
+            min_h = filters['min_height']
             applied_filters['min_height'] = filters['min_height']
         
         if 'max_latency' in filters:
-            feeds = feeds[feeds['LAT_MS'] <= filters['max_latency']]
+            use_mask |= SEARCH_MAX_LATENCY
+            max_lat = filters['max_latency']
             applied_filters['max_latency'] = filters['max_latency']
         
         if 'encrypted' in filters:
-            feeds = feeds[feeds['ENCR'] == filters['encrypted']]
+            use_mask |= SEARCH_ENCRYPTED
+            want_encr = bool(filters['encrypted'])
             applied_filters['encrypted'] = filters['encrypted']
         
         if 'civilian_safe' in filters:
-            feeds = feeds[feeds['CIV_OK'] == filters['civilian_safe']]
+            use_mask |= SEARCH_CIVILIAN_SAFE
+            want_civ = bool(filters['civilian_safe'])
             applied_filters['civilian_safe'] = filters['civilian_safe']
         
+        if t_val < 0 or c_val < 0:
+            # A theater/codec absent from the data matches nothing; -1 is also
+            # the code of missing values, so it must not reach the kernel
+            idx = np.empty(0, dtype=np.intp)
+        else:
+            # One pass over all columns in the (JIT-compiled when available) search kernel
+            idx = search_indices(
+                cat['THEATER'][0], cat['CODEC'][0], cols['RES_W'], cols['RES_H'], cols['LAT_MS'],
+                cols['ENCR'], cols['CIV_OK'], t_val, c_val, min_w, min_h, max_lat,
+                want_encr, want_civ, use_mask
+            )
+        
         return {
-            "feeds": feeds.to_dict('records'),
+            "feeds": _pack(feeds, columns, idx),
             "applied_filters": applied_filters,
-            "count": len(feeds),
-            "columns": list(feeds.columns)
+            "count": len(idx),
+            "columns": columns or self._columns
         }
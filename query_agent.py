@@ -1,108 +1,436 @@
 """
 LangGraph-based agentic query system for camera feed analysis.
 """
-from typing import Dict, List, Any, Optional, TypedDict
+from typing import Annotated, Dict, List, Any, Iterator, Literal, Optional, Tuple, get_args
+from dataclasses import dataclass, field
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage
-from langchain_core.tools import tool
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.tools import InjectedToolArg, tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from .mcp_tools import MCPTools
-import json
+from .semantic_cache import SemanticCache
+import os
+import re
+import orjson
 
 
-class QueryState(TypedDict):
-    messages: List[dict]
+# Tool selection is a short classification task served by a small model at
+# temperature 0; the answer is written by the response model
+PARSE_MODEL = "gpt-4o-mini"
+RESPONSE_MODEL = "gpt-4o-mini"
+
+# Enumerated argument values declared in the tool schemas. Strict mode is not
+# enforced on parallel tool calls, so they are also checked before a tool runs
+Theater = Literal["CONUS", "PAC", "EUR", "ME", "AFR", "ARC"]
+Codec = Literal["H264", "H265", "AV1", "VP9", "MPEG2"]
+ENUM_ARG_VALUES = {"theater": frozenset(get_args(Theater)), "codec": frozenset(get_args(Codec))}
+
+# Static instructions go first as a system message so the provider can serve the
+# identical prefix from its prompt cache; only the per-query data follows it.
+PARSE_SYSTEM_PROMPT = """
+You answer questions about a catalogue of military camera feeds.
+Call the tools that retrieve the data needed for the user's query:
+- Theaters: CONUS, PAC (Pacific), EUR (Europe), ME (Middle East), AFR (Africa), ARC (Arctic)
+- Codecs: H264, H265, AV1, VP9, MPEG2
+- Use search_feeds when the query combines several filters
+- Use get_high_quality_feeds for "best clarity" or "high quality" requests
+If the query needs no feed data, answer it directly without calling a tool.
+"""
+
+RESPONSE_SYSTEM_PROMPT = """
+Based on the user's query and the data results, generate a helpful response.
+Guidelines:
+1. Provide a clear, natural language response
+2. Include specific camera feed IDs when relevant
+3. Explain technical terms in user-friendly language
+4. If filtering results, show the count and key details
+5. If asking about quality, explain what makes feeds high quality
+6. Be conversational and helpful
+7. If matching_all_filters is present, it is the answer set; the other results only give per-filter counts
+"""
+
+# Prompt pieces built once: the system messages are shared and the per-query
+# message is joined from constant fragments instead of re-formatting a template
+PARSE_SYSTEM_MESSAGE = SystemMessage(content=PARSE_SYSTEM_PROMPT)
+RESPONSE_SYSTEM_MESSAGE = SystemMessage(content=RESPONSE_SYSTEM_PROMPT)
+PARSE_QUERY_PREFIX = 'Query: "'
+RESPONSE_QUERY_PREFIX = 'User Query: "'
+RESPONSE_INTENT_LABEL = '"\nIntent: '
+RESPONSE_DATA_LABEL = "\nData Results: "
+RESPONSE_SUFFIX = "\nResponse:"
+
+# The response prompt carries only the top feeds of each result plus histograms
+PROMPT_TOP_K = 10
+PROMPT_HISTOGRAM_COLUMNS = ("THEATER", "CODEC")
+
+# Cheap tool calls started speculatively while the intent-parsing LLM call is in
+# flight, keyed by a regex over the raw query. get_all_camera_feeds is always started.
+PREFETCH_RULES = (
+    (re.compile(r"pacific|\bpac\b", re.I), "filter_by_theater", {"theater": "PAC"}),
+    (re.compile(r"europe|\beur\b", re.I), "filter_by_theater", {"theater": "EUR"}),
+    (re.compile(r"h\.?265|hevc", re.I), "filter_by_codec", {"codec": "H265"}),
+    (re.compile(r"best|quality|clarity", re.I), "get_high_quality_feeds", {}),
+)
+
+# Keyword classifier answering the common queries without the parse LLM call
+INTENT_RE = re.compile(
+    r"(?P<theater_pac>pacific|\bpac\b)|(?P<theater_eur>europe|\beur\b)"
+    r"|(?P<codec_h265>h\.?265|hevc)|(?P<res_4k>\b4k\b|2160p)"
+    r"|(?P<quality>best|high quality|clarity)",
+    re.I
+)
+INTENT_SLOTS = {
+    "theater_pac": ("theater", "PAC"),
+    "theater_eur": ("theater", "EUR"),
+    "codec_h265": ("codec", "H265"),
+    "res_4k": ("resolution", "4K"),
+    "quality": ("quality", "high"),
+}
+# Constraints the classifier cannot express; queries mentioning them go to the LLM
+UNCLASSIFIED_RE = re.compile(
+    r"latency|\bms\b|encrypt|civilian|model|encoder|decoder|distribution|how many|\bcounts?\b"
+    r"|conus|middle east|africa|arctic|(?-i:\bME\b)|\b(?:afr|arc)\b|h\.?264|av1|vp9|mpeg|\d+p\b",
+    re.I
+)
+
+# Keyword intent slot -> tool call; a params builder returning None skips the slot
+RESOLUTION_BOUNDS = {"4K": {"min_width": 3840, "min_height": 2160}}
+INTENT_DISPATCH = (
+    ("theater", "filter_by_theater", lambda value: {"theater": value}),
+    ("codec", "filter_by_codec", lambda value: {"codec": value}),
+    ("quality", "get_high_quality_feeds", lambda value: {}),
+    ("resolution", "filter_by_resolution", RESOLUTION_BOUNDS.get),
+)
+
+
+def _classify_query(query: str) -> Dict[str, Any]:
+    """Keyword intent for a query; only the filters that were detected are set."""
+    intent = {"intent": "search"}
+    for match in INTENT_RE.finditer(query):
+        slot, value = INTENT_SLOTS[match.lastgroup]
+        intent[slot] = value
+    return intent
+
+
+def _strict_tool_schema(tool_obj) -> Dict[str, Any]:
+    """OpenAI tool schema in strict mode.
+
+    Strict mode makes every argument required, optional ones as nullable, and
+    does not accept ``default``; the model passes null for unused arguments,
+    which ``_invoke_tool_raw`` drops. OpenAI does not enforce strict schemas
+    on parallel tool calls, so ``_invoke_tool_raw`` also checks the
+    enumerated arguments itself.
+    """
+    schema = convert_to_openai_tool(tool_obj, strict=True)
+    parameters = schema["function"]["parameters"]
+    parameters.setdefault("required", [])
+    for prop in parameters["properties"].values():
+        prop.pop("default", None)
+    return schema
+
+
+def _intersect_feeds(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Feeds present in every filter result, ranked like the quality result when there is one."""
+    payloads = [result["feeds"] for result in results.values()]
+    base = next((feeds for feeds in payloads if "quality_score" in feeds), payloads[0])
+    common = set(base["FEED_ID"])
+    for feeds in payloads:
+        if feeds is not base:
+            common.intersection_update(feeds["FEED_ID"])
+    keep = [i for i, feed_id in enumerate(base["FEED_ID"]) if feed_id in common]
+    return {
+        "feeds": {column: [values[i] for i in keep] for column, values in base.items()},
+        "count": len(keep)
+    }
+
+
+def _summarize_results(data_results: Dict[str, Any]) -> Dict[str, Any]:
+    """Shrink tool results for the response prompt.
+
+    Feed lists are cut to their first ``PROMPT_TOP_K`` rows (already ranked
+    where the tool ranks them) next to the full count and theater/codec
+    histograms; other results pass through unchanged. Keys and ``call_args``
+    of repeated tool calls are kept so each summary names the call it answers.
+    When the filters were intersected, ``matching_all_filters`` is the answer
+    set and the per-filter results are reduced to their counts.
+    """
+    summary = {}
+    intersected = "matching_all_filters" in data_results
+    for name, result in data_results.items():
+        feeds = result.get("feeds") if isinstance(result, dict) else None
+        if not isinstance(feeds, dict):
+            summary[name] = result
+            continue
+        if intersected and name != "matching_all_filters":
+            entry = {key: value for key, value in result.items() if key not in ("feeds", "columns")}
+            entry.setdefault("count", len(next(iter(feeds.values()), ())))
+            summary[name] = entry
+            continue
+        columns = list(feeds)
+        rows = zip(*(feeds[column][:PROMPT_TOP_K] for column in columns))
+        entry = {key: value for key, value in result.items() if key not in ("feeds", "columns")}
+        entry.setdefault("count", len(feeds[columns[0]]) if columns else 0)
+        entry["top_feeds"] = [dict(zip(columns, row)) for row in rows]
+        for column in PROMPT_HISTOGRAM_COLUMNS:
+            if column in feeds:
+                entry[column.lower() + "_histogram"] = dict(Counter(feeds[column]))
+        summary[name] = entry
+    return summary
+
+# Tool results kept per agent, keyed by (tool name, sorted non-null arguments)
+TOOL_CACHE_SIZE = 256
+
+
+def _cache_key(tool_calls: List[Tuple[str, Dict[str, Any]]]) -> Tuple:
+    """Semantic cache partition: the resolved tool calls and their non-null arguments.
+
+    Paraphrases differing only in a theater, codec or threshold embed almost
+    identically, so queries may only share an answer if they fetched the
+    same data.
+    """
+    return tuple(sorted(
+        (_tool_key(name, {key: value for key, value in params.items() if value is not None})
+         for name, params in tool_calls),
+        key=repr
+    ))
+
+
+def _tool_key(tool_name: str, params: Dict[str, Any]) -> Tuple:
+    return tool_name, tuple(sorted(params.items()))
+
+
+@dataclass(slots=True)
+class QueryState:
+    """Graph state; nodes update it with attribute writes and return it."""
     query: str
-    intent: Optional[Dict[str, Any]]
-    data_results: Optional[Dict[str, Any]]
-    response: Optional[str]
-    error: Optional[str]
+    messages: List[dict] = field(default_factory=list)
+    intent: Optional[Dict[str, Any]] = None
+    data_results: Optional[Dict[str, Any]] = None
+    response: Optional[str] = None
+    error: Optional[str] = None
+    prefetched: Optional[Dict[Tuple, Future]] = None
+    tool_calls: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+
+
+@lru_cache(maxsize=8)
+def _get_mcp_tools(data_dir: str) -> MCPTools:
+    """MCPTools shared by every agent reading the same data directory."""
+    return MCPTools(data_dir)
+
+
+_worker_mcp_tools: Optional[MCPTools] = None
+
+
+def _init_tool_worker(data_dir: str):
+    """Process pool initializer: load the feed data once per worker process."""
+    global _worker_mcp_tools
+    _worker_mcp_tools = _get_mcp_tools(data_dir)
+
+
+def _call_tool_in_worker(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    return getattr(_worker_mcp_tools, tool_name)(**args)
+
+
+def _agent_node(method_name: str):
+    """Graph node delegating to a QueryAgent method on the agent in the run config."""
+    def node(state: QueryState, config: RunnableConfig) -> QueryState:
+        return getattr(config["configurable"]["agent"], method_name)(state)
+    node.__name__ = method_name
+    return node
 
 
 class QueryAgent:
-    def __init__(self, openai_api_key: str, data_dir: str = "."):
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            api_key=openai_api_key,
+    def __init__(self, openai_api_key: str, data_dir: str = ".",
+                 mcp_tools: Optional[MCPTools] = None,
+                 use_semantic_cache: bool = True,
+                 tool_processes: int = 0):
+        # The LLM and embedding clients and the MCP tools are built lazily on first use
+        self._openai_api_key = openai_api_key
+        self._use_semantic_cache = use_semantic_cache
+        self.data_dir = data_dir
+        if mcp_tools is not None:
+            self.mcp_tools = mcp_tools
+        # Tools and the compiled graph are built once per class and shared by every agent
+        self.tools = self._create_tools()
+        self._tools_by_name, _ = self._tool_index()
+        self._tool_cache = lru_cache(maxsize=TOOL_CACHE_SIZE)(
+            lambda tool_name, args: self._invoke_tool_raw(tool_name, dict(args))
+        )
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool-prefetch")
+        # Opt-in: run MCP methods in worker processes, each holding its own copy of the data
+        self._process_pool = ProcessPoolExecutor(
+            max_workers=tool_processes,
+            initializer=_init_tool_worker,
+            initargs=(os.path.abspath(data_dir),)
+        ) if tool_processes > 0 else None
+        # The shared graph bound to this agent, so a plain graph.invoke(state) works
+        self.graph = self._build_graph().with_config(configurable={"agent": self})
+        self._retrieval_graph = self._build_retrieval_graph().with_config(configurable={"agent": self})
+
+    def close(self):
+        """Shut down the agent's prefetch threads and tool worker processes."""
+        self._prefetch_pool.shutdown(wait=True, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "QueryAgent":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @cached_property
+    def parse_llm(self):
+        """Small deterministic model choosing tools via native function calling."""
+        _, tool_schemas = self._tool_index()
+        return ChatOpenAI(
+            model=PARSE_MODEL,
+            api_key=self._openai_api_key,
+            temperature=0
+        ).bind_tools(tool_schemas)
+
+    @cached_property
+    def response_llm(self) -> ChatOpenAI:
+        """Model writing the final natural-language answer."""
+        return ChatOpenAI(
+            model=RESPONSE_MODEL,
+            api_key=self._openai_api_key,
             temperature=0.1
         )
-        self.mcp_tools = MCPTools(data_dir)
-        self.tools = self._create_tools()
-        self.tool_node = ToolNode(self.tools)
-        self.graph = self._build_graph()
 
-    def _create_tools(self) -> List:
+    @cached_property
+    def semantic_cache(self) -> Optional[SemanticCache]:
+        """Serves answers to semantically equivalent queries without re-running the graph."""
+        if not self._use_semantic_cache:
+            return None
+        return SemanticCache(
+            OpenAIEmbeddings(model="text-embedding-3-small", api_key=self._openai_api_key)
+        )
+
+    @cached_property
+    def mcp_tools(self) -> MCPTools:
+        return _get_mcp_tools(os.path.abspath(self.data_dir))
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _create_tools(cls) -> Tuple:
+        """Build the LangChain tool wrappers once per class.
+
+        The MCPTools instance is an injected argument, hidden from the schema
+        the model sees, so every agent shares the same tool objects.
+        """
         @tool
-        def get_all_camera_feeds() -> str:
-            result = self.mcp_tools.get_all_camera_feeds()
-            return json.dumps(result, indent=2)
+        def get_all_camera_feeds(mcp_tools: Annotated[MCPTools, InjectedToolArg]) -> str:
+            """Get every camera feed in the catalogue."""
+            result = mcp_tools.get_all_camera_feeds()
+            return orjson.dumps(result).decode()
 
         @tool
-        def filter_by_theater(theater: str) -> str:
-            result = self.mcp_tools.filter_by_theater(theater)
-            return json.dumps(result, indent=2)
+        def filter_by_theater(mcp_tools: Annotated[MCPTools, InjectedToolArg],
+                              theater: Theater) -> str:
+            """Get camera feeds in a theater (CONUS, PAC, EUR, ME, AFR, ARC)."""
+            result = mcp_tools.filter_by_theater(theater)
+            return orjson.dumps(result).decode()
 
         @tool
-        def filter_by_codec(codec: str) -> str:
-            result = self.mcp_tools.filter_by_codec(codec)
-            return json.dumps(result, indent=2)
+        def filter_by_codec(mcp_tools: Annotated[MCPTools, InjectedToolArg],
+                            codec: Codec) -> str:
+            """Get camera feeds using a video codec (H264, H265, AV1, VP9, MPEG2)."""
+            result = mcp_tools.filter_by_codec(codec)
+            return orjson.dumps(result).decode()
 
         @tool
-        def filter_by_resolution(min_width: Optional[int] = None, 
+        def filter_by_resolution(mcp_tools: Annotated[MCPTools, InjectedToolArg],
+                               min_width: Optional[int] = None, 
                                min_height: Optional[int] = None,
                                max_width: Optional[int] = None,
                                max_height: Optional[int] = None) -> str:
-            result = self.mcp_tools.filter_by_resolution(min_width, min_height, max_width, max_height)
-            return json.dumps(result, indent=2)
+            """Get camera feeds whose resolution in pixels lies within the given bounds."""
+            result = mcp_tools.filter_by_resolution(min_width, min_height, max_width, max_height)
+            return orjson.dumps(result).decode()
 
         @tool
-        def filter_by_latency(max_latency: Optional[int] = None,
+        def filter_by_latency(mcp_tools: Annotated[MCPTools, InjectedToolArg],
+                             max_latency: Optional[int] = None,
                              min_latency: Optional[int] = None) -> str:
-            result = self.mcp_tools.filter_by_latency(max_latency, min_latency)
-            return json.dumps(result, indent=2)
+            """Get camera feeds whose end-to-end latency in milliseconds lies within the given bounds."""
+            result = mcp_tools.filter_by_latency(max_latency, min_latency)
+            return orjson.dumps(result).decode()
 
         @tool
-        def get_high_quality_feeds() -> str:
-            result = self.mcp_tools.get_high_quality_feeds()
-            return json.dumps(result, indent=2)
+        def get_high_quality_feeds(mcp_tools: Annotated[MCPTools, InjectedToolArg]) -> str:
+            """Get all camera feeds ranked by quality score (resolution, codec, latency)."""
+            result = mcp_tools.get_high_quality_feeds()
+            return orjson.dumps(result).decode()
 
         @tool
-        def filter_by_model(model_tag: str) -> str:
-            result = self.mcp_tools.filter_by_model(model_tag)
-            return json.dumps(result, indent=2)
+        def filter_by_model(mcp_tools: Annotated[MCPTools, InjectedToolArg],
+                            model_tag: str) -> str:
+            """Get camera feeds using an analytics model (e.g. Viper-VL, Hydra-ISR, Raptor-Det)."""
+            result = mcp_tools.filter_by_model(model_tag)
+            return orjson.dumps(result).decode()
 
         @tool
-        def filter_by_encryption(encrypted: bool = True) -> str:
-            result = self.mcp_tools.filter_by_encryption(encrypted)
-            return json.dumps(result, indent=2)
+        def filter_by_encryption(mcp_tools: Annotated[MCPTools, InjectedToolArg],
+                                 encrypted: bool = True) -> str:
+            """Get encrypted (or, with encrypted=false, unencrypted) camera feeds."""
+            result = mcp_tools.filter_by_encryption(encrypted)
+            return orjson.dumps(result).decode()
 
         @tool
-        def get_encoder_parameters() -> str:
-            result = self.mcp_tools.get_encoder_parameters()
-            return json.dumps(result, indent=2)
+        def get_encoder_parameters(mcp_tools: Annotated[MCPTools, InjectedToolArg]) -> str:
+            """Get the video encoder configuration shared by all camera feeds."""
+            result = mcp_tools.get_encoder_parameters()
+            return orjson.dumps(result).decode()
 
         @tool
-        def get_decoder_parameters() -> str:
-            result = self.mcp_tools.get_decoder_parameters()
-            return json.dumps(result, indent=2)
+        def get_decoder_parameters(mcp_tools: Annotated[MCPTools, InjectedToolArg]) -> str:
+            """Get the video decoder configuration shared by all camera feeds."""
+            result = mcp_tools.get_decoder_parameters()
+            return orjson.dumps(result).decode()
 
         @tool
-        def analyze_theater_distribution() -> str:
-            result = self.mcp_tools.analyze_theater_distribution()
-            return json.dumps(result, indent=2)
+        def analyze_theater_distribution(mcp_tools: Annotated[MCPTools, InjectedToolArg]) -> str:
+            """Count camera feeds per theater."""
+            result = mcp_tools.analyze_theater_distribution()
+            return orjson.dumps(result).decode()
 
         @tool
-        def analyze_codec_distribution() -> str:
-            result = self.mcp_tools.analyze_codec_distribution()
-            return json.dumps(result, indent=2)
+        def analyze_codec_distribution(mcp_tools: Annotated[MCPTools, InjectedToolArg]) -> str:
+            """Count camera feeds per video codec."""
+            result = mcp_tools.analyze_codec_distribution()
+            return orjson.dumps(result).decode()
 
         @tool
-        def search_feeds(**filters) -> str:
-            result = self.mcp_tools.search_feeds(**filters)
-            return json.dumps(result, indent=2)
+        def search_feeds(mcp_tools: Annotated[MCPTools, InjectedToolArg],
+                         theater: Optional[Theater] = None,
+                         codec: Optional[Codec] = None,
+                         min_width: Optional[int] = None,
+                         min_height: Optional[int] = None,
+                         max_latency: Optional[int] = None,
+                         encrypted: Optional[bool] = None,
+                         civilian_safe: Optional[bool] = None) -> str:
+            """Search camera feeds matching every given filter; null filters are not applied."""
+            filters = {
+                "theater": theater,
+                "codec": codec,
+                "min_width": min_width,
+                "min_height": min_height,
+                "max_latency": max_latency,
+                "encrypted": encrypted,
+                "civilian_safe": civilian_safe
+            }
+            result = mcp_tools.search_feeds(
+                **{key: value for key, value in filters.items() if value is not None}
+            )
+            return orjson.dumps(result).decode()
 
-        return [
+        return (
             get_all_camera_feeds,
             filter_by_theater,
             filter_by_codec,
@@ -116,149 +444,273 @@ class QueryAgent:
             analyze_theater_distribution,
             analyze_codec_distribution,
             search_feeds
-        ]
+        )
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _tool_index(cls) -> Tuple[Dict[str, Any], Tuple[Dict[str, Any], ...]]:
+        """Name -> tool mapping plus the strict OpenAI tool schemas, converted once per class."""
+        tools = cls._create_tools()
+        return {t.name: t for t in tools}, tuple(_strict_tool_schema(t) for t in tools)
 
-    def _build_graph(self) -> StateGraph:
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _build_retrieval_graph(cls) -> StateGraph:
+        """Compile parse_query -> execute_tools, everything before the final LLM call.
+
+        Compiled once per class; nodes run on the agent passed in the run config.
+        """
         workflow = StateGraph(QueryState)
-        workflow.add_node("parse_query", self._parse_query)
-        workflow.add_node("execute_tools", self._execute_tools)
-        workflow.add_node("generate_response", self._generate_response)
+        workflow.add_node("parse_query", _agent_node("_parse_query"))
+        workflow.add_node("execute_tools", _agent_node("_execute_tools"))
         workflow.set_entry_point("parse_query")
-        workflow.add_edge("parse_query", "execute_tools")
-        workflow.add_edge("execute_tools", "generate_response")
+        workflow.add_conditional_edges(
+            "parse_query", cls._route_after_parse, {"execute_tools": "execute_tools", END: END}
+        )
+        workflow.add_edge("execute_tools", END)
+        return workflow.compile()
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _build_graph(cls) -> StateGraph:
+        """Compile the full workflow: the retrieval sub-graph, then generate_response."""
+        workflow = StateGraph(QueryState)
+        workflow.add_node("retrieve", cls._build_retrieval_graph())
+        workflow.add_node("generate_response", _agent_node("_generate_response"))
+        workflow.set_entry_point("retrieve")
+        workflow.add_conditional_edges(
+            "retrieve", cls._route_after_retrieve, {"generate_response": "generate_response", END: END}
+        )
         workflow.add_edge("generate_response", END)
         return workflow.compile()
 
     def _parse_query(self, state: QueryState) -> QueryState:
-        query = state["query"]
-        prompt = f"""
-        Analyze this camera feed query and extract the intent and parameters:
-        Query: "{query}"
-        Extract:
-        1. Intent type (filter, search, analyze, get_info)
-        2. Theater (CONUS, PAC, EUR, ME, AFR, ARC) if mentioned
-        3. Codec (H264, H265, AV1, VP9, MPEG2) if mentioned
-        4. Resolution requirements (4K, 1080p, 720p, etc.)
-        5. Quality requirements (best clarity, high quality, etc.)
-        6. Latency requirements (low latency, real-time, etc.)
-        7. Other filters (encrypted, civilian safe, etc.)
-        Return as JSON format:
-        {{
-            "intent": "filter|search|analyze|get_info",
-            "theater": "theater_code_or_null",
-            "codec": "codec_or_null",
-            "resolution": "resolution_requirement_or_null",
-            "quality": "quality_requirement_or_null",
-            "latency": "latency_requirement_or_null",
-            "other_filters": {{"key": "value"}}
-        }}
-        """
+        query = state.query
+        intent = _classify_query(query)
+        if len(intent) > 1 and not UNCLASSIFIED_RE.search(query):
+            state.intent = intent
+            return state
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
-            if "```json" in content:
-                json_start = content.find("```json") + 7
-                json_end = content.find("```", json_start)
-                content = content[json_start:json_end].strip()
-            elif "```" in content:
-                json_start = content.find("```") + 3
-                json_end = content.find("```", json_start)
-                content = content[json_start:json_end].strip()
-            intent_data = json.loads(content)
-            state["intent"] = intent_data
-        except Exception as e:
-            query_lower = query.lower()
-            intent_data = {
-                "intent": "search",
-                "theater": None,
-                "codec": None,
-                "resolution": None,
-                "quality": None,
-                "latency": None,
-                "other_filters": {}
-            }
-            if "pacific" in query_lower or "pac" in query_lower:
-                intent_data["theater"] = "PAC"
-            if "europe" in query_lower or "eur" in query_lower:
-                intent_data["theater"] = "EUR"
-            if "h265" in query_lower:
-                intent_data["codec"] = "H265"
-            if "4k" in query_lower:
-                intent_data["resolution"] = "4K"
-            if "best" in query_lower or "quality" in query_lower:
-                intent_data["quality"] = "high"
-            state["intent"] = intent_data
+            response = self.parse_llm.invoke([
+                PARSE_SYSTEM_MESSAGE,
+                HumanMessage(content=PARSE_QUERY_PREFIX + query + '"')
+            ])
+            if response.tool_calls:
+                state.intent = {
+                    "intent": "tool_calls",
+                    "tool_calls": [
+                        {"name": call["name"], "args": call["args"]} for call in response.tool_calls
+                    ]
+                }
+            else:
+                # The model answered without needing data: no second round trip
+                state.intent = {"intent": "answer"}
+                state.response = response.content
+        except Exception:
+            state.intent = intent
         return state
 
+    @staticmethod
+    def _route_after_parse(state: QueryState) -> str:
+        return END if state.response else "execute_tools"
+
+    @staticmethod
+    def _route_after_retrieve(state: QueryState) -> str:
+        return END if state.response else "generate_response"
+
     def _execute_tools(self, state: QueryState) -> QueryState:
-        intent = state.get("intent", {})
+        intent = state.intent or {}
         if intent.get("intent") == "error":
-            state["data_results"] = {"error": intent.get("error", "Unknown error")}
+            state.data_results = {"error": intent.get("error", "Unknown error")}
             return state
         try:
             tool_calls = []
-            if intent.get("intent") in ["filter", "search", "analyze"]:
-                if intent.get("theater"):
-                    tool_calls.append(("filter_by_theater", {"theater": intent["theater"]}))
-                elif intent.get("codec"):
-                    tool_calls.append(("filter_by_codec", {"codec": intent["codec"]}))
-                elif intent.get("quality") == "high" or "best" in intent.get("quality", "").lower():
-                    tool_calls.append(("get_high_quality_feeds", {}))
-                else:
+            intersect = False
+            if intent.get("tool_calls"):
+                tool_calls = [(call["name"], call["args"]) for call in intent["tool_calls"]]
+            elif intent.get("intent") in ["filter", "search", "analyze"]:
+                # Every detected filter is queried; the results are intersected below
+                for slot, tool_name, build_params in INTENT_DISPATCH:
+                    value = intent.get(slot)
+                    params = build_params(value) if value else None
+                    if params is not None:
+                        tool_calls.append((tool_name, params))
+                if not tool_calls:
                     tool_calls.append(("get_all_camera_feeds", {}))
-            results = {}
-            for tool_name, params in tool_calls:
-                tool_func = next(tool for tool in self.tools if tool.name == tool_name)
-                result = tool_func.invoke(params)
-                results[tool_name] = json.loads(result)
-            state["data_results"] = results
+                intersect = len(tool_calls) > 1
+            state.tool_calls = tool_calls
+            results = self._run_tools(tool_calls, state.prefetched or {})
+            if intersect:
+                results["matching_all_filters"] = _intersect_feeds(results)
+            state.data_results = results
         except Exception as e:
-            state["error"] = f"Error executing tools: {str(e)}"
-            state["data_results"] = {"error": str(e)}
+            state.error = f"Error executing tools: {str(e)}"
+            state.data_results = {"error": str(e)}
         return state
 
+    def _run_tools(self, tool_calls: List[Tuple[str, Dict[str, Any]]],
+                   prefetched: Dict[Tuple, Future]) -> Dict[str, Any]:
+        """Run independent tool calls concurrently, reusing prefetched results.
+
+        Results are keyed by tool name; when the model calls one tool several
+        times, each call is keyed ``name#position`` and carries its ``call_args``.
+        """
+        calls_per_tool = Counter(tool_name for tool_name, _ in tool_calls)
+        futures = []
+        for tool_name, params in tool_calls:
+            future = prefetched.get(_tool_key(tool_name, params))
+            if future is None and len(tool_calls) > 1:
+                future = self._prefetch_pool.submit(self._invoke_tool, tool_name, params)
+            futures.append((tool_name, params, future))
+        results = {}
+        for position, (tool_name, params, future) in enumerate(futures):
+            result = future.result() if future is not None else self._invoke_tool(tool_name, params)
+            if calls_per_tool[tool_name] > 1:
+                results[f"{tool_name}#{position}"] = {**result, "call_args": params}
+            else:
+                results[tool_name] = result
+        return results
+
+    def _invoke_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a tool through the agent's LRU cache of results.
+
+        The feed data is read-only, so equal calls (same name, same non-null
+        arguments in any order) share one result.
+        """
+        args = tuple(sorted((key, value) for key, value in params.items() if value is not None))
+        try:
+            hash(args)
+        except TypeError:
+            return self._invoke_tool_raw(tool_name, params)
+        return self._tool_cache(tool_name, args)
+
+    def clear_tool_cache(self):
+        """Forget cached tool results, e.g. after the MCP data was reloaded."""
+        self._tool_cache.cache_clear()
+
+    def _invoke_tool_raw(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the MCP method behind a tool directly, skipping the wrapper's JSON round trip."""
+        if tool_name not in self._tools_by_name:
+            raise KeyError(f"Unknown tool: {tool_name}")
+        # Tool arguments the model left as null fall back to the method defaults
+        args = {key: value for key, value in params.items() if value is not None}
+        for key, allowed in ENUM_ARG_VALUES.items():
+            if key in args and args[key] not in allowed:
+                raise ValueError(f"Invalid {key} for {tool_name}: {args[key]!r}")
+        if self._process_pool is not None:
+            return self._process_pool.submit(_call_tool_in_worker, tool_name, args).result()
+        return getattr(self.mcp_tools, tool_name)(**args)
+
+    def _prefetch_tools(self, query: str) -> Dict[Tuple, Future]:
+        """Start the tool calls the query most likely needs, overlapping them with the parse LLM call."""
+        calls = [("get_all_camera_feeds", {})]
+        calls.extend((name, params) for pattern, name, params in PREFETCH_RULES if pattern.search(query))
+        return {
+            _tool_key(name, params): self._prefetch_pool.submit(self._invoke_tool, name, params)
+            for name, params in calls
+        }
+
     def _generate_response(self, state: QueryState) -> QueryState:
-        query = state["query"]
-        intent = state.get("intent", {})
-        data_results = state.get("data_results", {})
-        if state.get("error"):
-            state["response"] = f"I encountered an error: {state['error']}"
+        if state.error:
+            state.response = f"I encountered an error: {state.error}"
             return state
-        prompt = f"""
-        Based on the user's query and the data results, generate a helpful response.
-        User Query: "{query}"
-        Intent: {json.dumps(intent, indent=2)}
-        Data Results: {json.dumps(data_results, indent=2)}
-        Guidelines:
-        1. Provide a clear, natural language response
-        2. Include specific camera feed IDs when relevant
-        3. Explain technical terms in user-friendly language
-        4. If filtering results, show the count and key details
-        5. If asking about quality, explain what makes feeds high quality
-        6. Be conversational and helpful
-        Response:
-        """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            state["response"] = response.content
+            response = self.response_llm.invoke(self._response_messages(state))
+            state.response = response.content
         except Exception as e:
-            state["response"] = f"I encountered an error generating the response: {str(e)}"
+            state.response = f"I encountered an error generating the response: {str(e)}"
         return state
 
+    def _response_messages(self, state: QueryState) -> List[Any]:
+        intent = state.intent or {}
+        data_results = _summarize_results(state.data_results or {})
+        prompt = "".join((
+            RESPONSE_QUERY_PREFIX, state.query,
+            RESPONSE_INTENT_LABEL, orjson.dumps(intent).decode(),
+            RESPONSE_DATA_LABEL, orjson.dumps(data_results).decode(),
+            RESPONSE_SUFFIX
+        ))
+        return [RESPONSE_SYSTEM_MESSAGE, HumanMessage(content=prompt)]
+
     def query(self, query: str) -> Dict[str, Any]:
-        initial_state = {
-            "messages": [],
-            "query": query,
-            "intent": None,
-            "data_results": None,
-            "response": None,
-            "error": None
-        }
-        result = self.graph.invoke(initial_state)
-        return {
+        state, cached, embedding = self._retrieve(query)
+        if cached is not None:
+            return {**cached, "query": query}
+        if self._route_after_retrieve(state) != END:
+            state = self._generate_response(state)
+        return self._finish(query, state, embedding)
+
+    def query_stream(self, query: str) -> Iterator[str]:
+        """Answer a query, yielding the response text as the model generates it.
+
+        The retrieval sub-graph of ``graph`` runs as usual; only the final
+        response LLM call is streamed, so the first tokens arrive without
+        waiting for the whole answer. The generator's return value is the
+        result dict ``query`` would return.
+        """
+        state, cached, embedding = self._retrieve(query)
+        if cached is not None:
+            yield cached["response"]
+            return {**cached, "query": query}
+        if self._route_after_retrieve(state) == END or state.error:
+            # Answered by the parse step, or a tool error reported without the model
+            if state.error:
+                state = self._generate_response(state)
+            yield state.response
+        else:
+            parts = []
+            try:
+                for chunk in self.response_llm.stream(self._response_messages(state)):
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield chunk.content
+                state.response = "".join(parts)
+            except Exception as e:
+                state.response = f"I encountered an error generating the response: {str(e)}"
+                yield state.response
+        return self._finish(query, state, embedding)
+
+    def _retrieve(self, query: str) -> Tuple[QueryState, Optional[Dict[str, Any]], Any]:
+        """Run the retrieval sub-graph, then look the answer up in the semantic cache.
+
+        Returns ``(state, cached_result_or_None, embedding_to_store_or_None)``.
+        The cache is keyed by the tool calls the query resolved to, so it is
+        consulted only once they are known; the query is embedded meanwhile.
+        """
+        prefetched = self._prefetch_tools(query)
+        pending_embedding = (
+            self._prefetch_pool.submit(self.semantic_cache.embed, query)
+            if self.semantic_cache is not None else None
+        )
+        try:
+            result = self._retrieval_graph.invoke(QueryState(query=query, prefetched=prefetched))
+        finally:
+            self._cancel(prefetched)
+        state = QueryState(**result)
+        if pending_embedding is None or state.response or state.error or not state.tool_calls:
+            return state, None, None
+        try:
+            vector = pending_embedding.result()
+            cached, vector = self.semantic_cache.lookup(
+                query, key=_cache_key(state.tool_calls), vector=vector
+            )
+        except Exception:
+            return state, None, None
+        return state, cached, vector
+
+    @staticmethod
+    def _cancel(prefetched: Dict[Tuple, Future]):
+        for future in prefetched.values():
+            future.cancel()
+
+    def _finish(self, query: str, result: QueryState, embedding: Any) -> Dict[str, Any]:
+        output = {
             "query": query,
-            "response": result["response"],
-            "intent": result.get("intent"),
-            "data_results": result.get("data_results"),
-            "error": result.get("error")
+            "response": result.response,
+            "intent": result.intent,
+            "data_results": result.data_results,
+            "error": result.error
         }
+        if embedding is not None and not output["error"]:
+            self.semantic_cache.add(embedding, output, key=_cache_key(result.tool_calls))
+        return output
@@ -0,0 +1,102 @@
+"""
+Embedding-based semantic cache for agent query results.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """Caches query results keyed by the embedding of the normalized query.
+
+    A lookup embeds the query once and compares it against every cached entry
+    with a single matrix-vector product over L2-normalized vectors (cosine
+    similarity). An optional hashable ``key`` partitions the entries: a lookup
+    only matches entries stored under an equal key. Entries expire after
+    ``ttl_seconds`` and the least recently used entry is evicted once
+    ``max_entries`` is reached.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.92,
+                 max_entries: int = 512, ttl_seconds: float = 3600.0):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._matrix = None
+        self._results = []
+        self._keys = []
+        self._created = deque()
+        self._last_used = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def embed(self, query: str) -> np.ndarray:
+        """Embed a query as an L2-normalized vector."""
+        vector = np.asarray(self.embeddings.embed_query(self._normalize(query)), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, query: str, key: Hashable = None,
+               vector: Optional[np.ndarray] = None) -> Tuple[Optional[Dict[str, Any]], np.ndarray]:
+        """Return ``(cached_result_or_None, query_embedding)``.
+
+        Only entries added under ``key`` are candidates. ``vector`` may carry
+        an embedding already computed with ``embed``. The embedding is
+        returned so a miss can be stored with ``add`` without embedding the
+        query a second time.
+        """
+        if vector is None:
+            vector = self.embed(query)
+        with self._lock:
+            self._expire()
+            if self._matrix is None or not len(self._results):
+                return None, vector
+            similarities = self._matrix @ vector
+            similarities[np.array([k != key for k in self._keys], dtype=bool)] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None, vector
+            self._last_used[best] = time.monotonic()
+            return self._results[best], vector
+
+    def add(self, vector: np.ndarray, result: Dict[str, Any], key: Hashable = None):
+        """Store a result under an embedding returned by ``lookup`` and an optional key."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire()
+            if len(self._results) >= self.max_entries:
+                self._evict(int(np.argmin(self._last_used)))
+            row = vector[np.newaxis, :]
+            self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+            self._results.append(result)
+            self._keys.append(key)
+            self._created.append(now)
+            self._last_used.append(now)
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._matrix = None
+            self._results.clear()
+            self._keys.clear()
+            self._created.clear()
+            self._last_used.clear()
+
+    def _expire(self):
+        # Entries are appended in creation order, so expired ones are at the front
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._created and self._created[0] < cutoff:
+            self._evict(0)
+
+    def _evict(self, index: int):
+        self._matrix = np.delete(self._matrix, index, axis=0)
+        del self._results[index]
+        del self._keys[index]
+        del self._created[index]
+        del self._last_used[index]
@@ -0,0 +1,16 @@
+"""
+Make the repository importable as the ``src`` package, as app.py imports it.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if "src" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "src", ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["src"] = module
+    spec.loader.exec_module(module)
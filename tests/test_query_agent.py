@@ -0,0 +1,91 @@
+"""
+Semantic cache partitioning in QueryAgent.
+"""
+import re
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from conftest import ROOT
+from src.query_agent import QueryAgent
+from src.semantic_cache import SemanticCache
+
+
+class ConstantEmbeddings:
+    """Embeds every query to the same vector, the worst case for paraphrases."""
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+class ToolCallingLLM:
+    """Parse model stand-in resolving queries to tool calls with fixed rules."""
+
+    THEATERS = {"middle east": "ME", "africa": "AFR", "pacific": "PAC", "europe": "EUR"}
+
+    def invoke(self, messages):
+        query = messages[-1].content.lower()
+        args = {}
+        for name, code in self.THEATERS.items():
+            if name in query:
+                args["theater"] = code
+        if "civilian" in query:
+            args["civilian_safe"] = True
+        if "encrypted" in query:
+            args["encrypted"] = "unencrypted" not in query
+        if "av1" in query:
+            args["codec"] = "AV1"
+        latency = re.search(r"latency under (\d+)", query)
+        if latency:
+            args["max_latency"] = int(latency.group(1))
+        resolution = re.search(r"(\d+)p", query)
+        if resolution:
+            args["min_height"] = int(resolution.group(1))
+        return AIMessage(content="", tool_calls=[{"name": "search_feeds", "args": args, "id": "1"}])
+
+
+class EchoLLM:
+    """Response model stand-in answering with the query it was asked about."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        match = re.search(r'User Query: "(.*)"\nIntent', messages[-1].content)
+        return AIMessage(content=match.group(1))
+
+
+@pytest.fixture
+def agent():
+    agent = QueryAgent("sk-test", str(ROOT))
+    agent.semantic_cache = SemanticCache(ConstantEmbeddings())
+    agent.parse_llm = ToolCallingLLM()
+    agent.response_llm = EchoLLM()
+    yield agent
+    agent.close()
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Show me all civilian-safe cameras in the Middle East",
+     "Show me all civilian-safe cameras in Africa"),
+    ("Find all cameras with latency under 200ms",
+     "Find all cameras with latency under 500ms"),
+    ("Find encrypted feeds with the AV1 codec",
+     "Find unencrypted feeds with the AV1 codec"),
+    ("Show me all 4K cameras in the Pacific region",
+     "Show me all 4K cameras in the Europe region"),
+    ("Show me all 4K cameras in the Pacific region",
+     "Show me all 1080p cameras in the Pacific region"),
+])
+def test_near_identical_queries_do_not_share_answers(agent, first, second):
+    assert agent.query(first)["response"] == first
+    assert agent.query(second)["response"] == second
+    assert agent.response_llm.calls == 2
+
+
+def test_repeated_query_is_served_from_cache(agent):
+    query = "Find all cameras with latency under 200ms"
+    agent.query(query)
+    assert agent.query(query)["response"] == query
+    assert agent.response_llm.calls == 1